@@ -7,62 +7,252 @@ Implements the backend functionality for the EMO Bridge application,
 including Gemini API integration, speech recognition, and text-to-speech.
 """
 
+import os
+import queue
+import random
+import re
+import tempfile
 import threading
 import time
-import google.generativeai as genai
-import google.api_core.exceptions
+from concurrent.futures import Future, ThreadPoolExecutor
 import speech_recognition as sr
-import pyttsx3
-import paho.mqtt.client as mqtt
-import requests
 import platform
 import subprocess
 
+from app.response_cache import ResponseCache, normalize
+from app.tts_backend import MacSpeechSynthesizer, espeak_say, pyttsx_say, sapi_say, stop_all
+from app.tts_cache import TTSCache, cache_key
+from app.stt import (
+    GoogleRecognizer,
+    VoiceActivityDetector,
+    create_interrupt_recognizer,
+    create_recognizer
+)
+
+
+# Pattern to match emoji characters, compiled once and shared by all TTS paths
+_EMOJI_RE = re.compile(
+    "["
+    "\U0001F600-\U0001F64F"  # emoticons
+    "\U0001F300-\U0001F5FF"  # symbols & pictographs
+    "\U0001F680-\U0001F6FF"  # transport & map symbols
+    "\U0001F700-\U0001F77F"  # alchemical symbols
+    "\U0001F780-\U0001F7FF"  # Geometric Shapes
+    "\U0001F800-\U0001F8FF"  # Supplemental Arrows-C
+    "\U0001F900-\U0001F9FF"  # Supplemental Symbols and Pictographs
+    "\U0001FA00-\U0001FA6F"  # Chess Symbols
+    "\U0001FA70-\U0001FAFF"  # Symbols and Pictographs Extended-A
+    "\U00002702-\U000027B0"  # Dingbats
+    "\U000024C2-\U0001F251"
+    "]", flags=re.UNICODE)
+
+
+def _strip_emojis(text):
+    """
+    Remove emoji characters from text before sending it to TTS
+    """
+    return _EMOJI_RE.sub('', text)
+
+
+# A sentence ends at punctuation followed by whitespace, so decimals and
+# abbreviations glued to the next character are not split
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?;:])\s+")
+
+
+def _split_sentences(text):
+    """
+    Split the complete sentences off the front of streamed text.
+
+    Returns (sentences, remainder) where remainder is the unfinished tail
+    that should be kept until more text arrives.
+    """
+    parts = _SENTENCE_END_RE.split(text)
+    remainder = parts.pop()
+    sentences = [part.strip() for part in parts if part.strip()]
+    return sentences, remainder
+
+
+# Until the first sentence ends, a clause this long is spoken on its own so a
+# long opening sentence doesn't hold back the start of playback
+_FIRST_CLAUSE_MIN_CHARS = 40
+
+
+def _split_first_clause(text):
+    """
+    Split text at its last comma once it is long enough to be worth
+    speaking on its own. Returns (clauses, remainder) like _split_sentences.
+    """
+    if len(text) < _FIRST_CLAUSE_MIN_CHARS:
+        return [], text
+    end = text.rfind(", ")
+    if end < 0:
+        return [], text
+    return [text[:end + 1].strip()], text[end + 2:]
+
+
+# Voice commands, matched against the whole normalized utterance
+_QUIT_WORDS = frozenset({"quit", "exit", "stop", "end"})
+_INTERRUPT_WORDS = frozenset({"stop", "quiet", "shut up", "be quiet", "enough"})
+
+# Persona names (and common mis-recognitions) as whole words, so words like
+# "ótimo" or "temos" don't switch persona; the first one mentioned wins
+_PERSONA_RE = re.compile(r"\b(emo|imo|sophia|sofia)\b")
+_PERSONA_ALIASES = {
+    "emo": "EMO",
+    "imo": "EMO",
+    "sophia": "Sophia",
+    "sofia": "Sophia",
+}
+
+
+# Tone of each persona, the first part of its system instruction
+_PERSONA_INSTRUCTIONS = {
+    "EMO": (
+        "Speak in a playful, casual tone. "
+        "Keep replies short, friendly, sometimes with emojis or fun expressions."
+    ),
+    "Sophia": (
+        "Speak in a wise, formal, and calm tone. "
+        "Use full sentences, no emojis, and sound like a mentor."
+    ),
+}
+_DEFAULT_PERSONA_INSTRUCTION = "Respond in a helpful, concise manner."
+
+
+# Fixed parts of every persona's system instruction
+# Hardcoded to Portuguese - no language selection
+_LANGUAGE_INSTRUCTION = "Always reply in Portuguese (Portugal), natural conversational style. Ignore the language the user speaks in and ALWAYS respond in Portuguese (Portugal)."
+_EMOJI_INSTRUCTION = "Include emojis in your responses."
+_QUIT_INSTRUCTION = "If the user asks to quit/exit/end/stop (in any language), reply ONLY with the word QUIT."
+
+
+# macOS voices for each persona
+_MAC_VOICES = {
+    "EMO": "Catarina",
+    "Sophia": "Joana",
+}
+_DEFAULT_MAC_VOICE = "Catarina"
+
+# Command line players for pre-rendered speech, per platform
+_AUDIO_PLAYERS = {
+    "Darwin": ["afplay"],
+    "Linux": ["aplay", "-q"],
+}
+
+
+# Exchanges of conversation history sent with each turn; older ones are
+# dropped so requests stay small
+_MAX_HISTORY_TURNS = 6
+
+
+def _user_turn(text):
+    return {"role": "user", "parts": [f'User said: "{text}"']}
+
+
+def _chunk_text(chunk):
+    """
+    Text of a streamed reply chunk. The last chunk may only carry the finish
+    reason (stop sequence, token cap, safety block); it has no parts, and
+    reading .text on it raises ValueError.
+    """
+    try:
+        return chunk.text
+    except ValueError:
+        return ""
+
+
+# Finish reasons for which Gemini withheld a reply rather than ending it
+_BLOCKED_FINISH_REASONS = frozenset({"SAFETY", "RECITATION", "BLOCKLIST", "PROHIBITED_CONTENT", "SPII"})
+
+
+def _block_reason(chunk):
+    """
+    Return why the reply a chunk belongs to was blocked, or None
+    """
+    feedback = getattr(chunk, "prompt_feedback", None)
+    if feedback is not None and feedback.block_reason:
+        return getattr(feedback.block_reason, "name", str(feedback.block_reason))
+    for candidate in getattr(chunk, "candidates", None) or ():
+        reason = getattr(candidate.finish_reason, "name", str(candidate.finish_reason))
+        if reason in _BLOCKED_FINISH_REASONS:
+            return reason
+    return None
+
+
+class _ReplyBlocked(Exception):
+    """
+    Gemini withheld the reply, e.g. for safety; the connection is fine
+    """
+
+
+# Likely answers to a reply, generated speculatively while it is spoken
+_PREFETCH_FOLLOWUPS = ("sim", "não", "conta-me mais")
+
+
+# How long one listen() waits for speech to start before the voice loop
+# lets go of the microphone and checks whether its session was stopped
+_LISTEN_TIMEOUT = 1.0
+
+
+# Consecutive Gemini failures after which the session gives up
+_MAX_NETWORK_ERRORS = 5
+
+
+def _backoff_delay(attempt, base=0.5, cap=30.0):
+    """
+    Exponential backoff with jitter for the given number of consecutive
+    failures, so retries spread out instead of hammering the API
+    """
+    return min(cap, base * 2 ** attempt) * (0.5 + random.random())
+
+
+# Errors in the voice loop that point at a bug rather than a transient
+# failure; the session ends instead of retrying
+_FATAL_ERRORS = (AttributeError, NameError, TypeError, ValueError)
+
+
+def _server_retry_delay(error):
+    """
+    Return the retry delay in seconds that the server sent with a quota
+    error, or None if it didn't include one
+    """
+    for detail in getattr(error, "details", None) or ():
+        delay = getattr(detail, "retry_delay", None)
+        if delay is None:
+            continue
+        if hasattr(delay, "total_seconds"):
+            return delay.total_seconds()
+        return delay.seconds + delay.nanos / 1e9
+    return None
+
+
+# MQTT publishes are coalesced for up to this long / this many messages
+_MQTT_BATCH_WINDOW = 0.05
+_MQTT_BATCH_SIZE = 20
+
 
 def speak(text, rate=180, volume=1.0):
     """
     Cross-platform TTS function.
     - On macOS: uses the 'say' command.
-    - On Linux: uses 'espeak'.
-    - On Windows: uses pyttsx3.
+    - On Linux: uses the espeak-ng library, or the 'espeak' command.
+    - On Windows: uses SAPI directly, or pyttsx3.
     
     Automatically strips emojis from text before sending to TTS.
     """
     try:
-        # Strip emojis from text using regex
-        import re
-        # Pattern to match emoji characters
-        emoji_pattern = re.compile(
-            "["
-            "\U0001F600-\U0001F64F"  # emoticons
-            "\U0001F300-\U0001F5FF"  # symbols & pictographs
-            "\U0001F680-\U0001F6FF"  # transport & map symbols
-            "\U0001F700-\U0001F77F"  # alchemical symbols
-            "\U0001F780-\U0001F7FF"  # Geometric Shapes
-            "\U0001F800-\U0001F8FF"  # Supplemental Arrows-C
-            "\U0001F900-\U0001F9FF"  # Supplemental Symbols and Pictographs
-            "\U0001FA00-\U0001FA6F"  # Chess Symbols
-            "\U0001FA70-\U0001FAFF"  # Symbols and Pictographs Extended-A
-            "\U00002702-\U000027B0"  # Dingbats
-            "\U000024C2-\U0001F251" 
-            "]", flags=re.UNICODE)
-        
         # Remove emojis from text
-        clean_text = emoji_pattern.sub(r'', text)
+        clean_text = _strip_emojis(text)
         
         system = platform.system()
         if system == "Darwin":  # macOS
             subprocess.run(["say", clean_text])
         elif system == "Linux":  # Linux
-            subprocess.run(["espeak", clean_text])
+            if not espeak_say(clean_text, rate, volume):
+                subprocess.run(["espeak", clean_text])
         else:  # Windows
-            engine = pyttsx3.init()
-            engine.setProperty("rate", rate)
-            engine.setProperty("volume", volume)
-            engine.say(clean_text)
-            engine.runAndWait()
-            engine.stop()
-            del engine
+            if not sapi_say(clean_text, rate, volume):
+                pyttsx_say(clean_text, rate, volume)
     except Exception as e:
         print(f"TTS Error in speak(): {e}")
 
@@ -76,123 +266,557 @@ class EMOBridgeBackend:
         self.status_callback = status_callback
         self.persona = persona
         # Hardcoded to Portuguese - no longer using config language setting
-        self.running = False
         self.thread = None
+        # Guards state the GUI thread and the session threads both change:
+        # persona and model, session start/stop, and the MQTT client
+        self._lock = threading.RLock()
+        # Set when the session stops; waits in the voice loop use it so a
+        # stop request doesn't sit out a retry delay. Starts out stopped.
+        self._stop_event = threading.Event()
+        self._stop_event.set()
         self.recognizer = sr.Recognizer()
+        # Microphone stream shared by the voice loop and interrupt listener
+        self._mic_source = None
+        self._mic_lock = threading.Lock()
+        # Keeps one HTTP connection to Google speech open across turns
+        self.google_stt = GoogleRecognizer(timeout=self.recognizer.operation_timeout)
+        self.stt = None
+        self.interrupt_stt = None
+        self._stt_settings = None
+        self._vad = VoiceActivityDetector()
         self.mqtt_client = None
+        self._mqtt_queue = None
+        self._mqtt_topics = []
         self.speaking = False
         self.tts_thread = None
+        self._tts_queue = queue.Queue()
+        self._tts_process = None  # Running 'say' process, if any
+        self._mac_synthesizer = None  # Native macOS synthesizer, False if unavailable
+        self._tts_renderer = None  # Pool rendering sentences ahead of playback
+        self._tts_settings = None  # (concurrency, render ahead) the renderer was built for
+        self._tts_cache = None  # On-disk cache of rendered phrases
+        self._tts_cache_mb = None
+        self._histories = {}  # persona -> recent turns sent as context
+        # Shared workers for background network and speech jobs (prefetch,
+        # goodbye message) so none of them holds up the voice loop or the GUI
+        self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="emo-bridge")
+        self._prefetched = None  # (persona, {normalized follow-up: Future}) for the next turn
+        self._tts_lock = threading.Lock()
         self.background_listener = None
         self.interrupt_event = threading.Event()
         self.connection_error = False  # Track network connection status
+        self._network_error_count = 0  # Consecutive failed Gemini calls
+        self._session_status = "Idle"  # Status reported when the voice loop ends
+
+        # Configure speech recognition for the user's turns
+        self._configure_stt()
+
+        # Configure text-to-speech
+        self._configure_tts()
 
         # Configure Gemini API
         self._configure_gemini()
 
+        # Cache of previous replies for repeated utterances
+        self._configure_response_cache()
+
         # Configure MQTT if enabled
         if config.get('enable_mqtt', False):
             self._configure_mqtt()
 
     def _configure_gemini(self):
         api_key = self.config.get('gemini_api_key', '')
+        self._api_key = api_key
         if api_key:
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel("gemini-1.5-flash")
+            # The SDK pulls in gRPC and protobuf, so it is only loaded once
+            # there is a key to use it with
+            import google.generativeai as genai
+
+            # The gRPC channel created here is reused by every request
+            genai.configure(api_key=api_key, transport="grpc")
+            self._reset_models()
         else:
+            self._models = {}
             self.model = None
             if self.status_callback:
                 self.status_callback("Error")
 
+    def _reset_models(self):
+        """
+        Drop the per-persona models so they are rebuilt with the current
+        generation settings
+        """
+        import google.generativeai as genai
+
+        self._max_output_tokens = self.config.get('max_output_tokens', 120)
+        # Spoken replies are short: cap their length (every token is extra
+        # generation and playback time) and stop at the first paragraph break
+        self._generation_config = genai.types.GenerationConfig(
+            candidate_count=1,
+            max_output_tokens=self._max_output_tokens,
+            temperature=0.7,
+            stop_sequences=["\n\n"]
+        )
+        self._models = {}
+        self.model = self._get_model(self.persona)
+
+    def _configure_stt(self):
+        self._language_mode = self.config.get('language_mode', 'en-US')
+
+        settings = (
+            self.config.get('stt_engine', 'google'),
+            self.config.get('vosk_model_path', 'model'),
+            self.config.get('whisper_model', 'small'),
+            self.config.get('interrupt_vosk_model_path', '')
+        )
+        # Local models are expensive to load, only rebuild when settings change
+        if settings == self._stt_settings:
+            return
+        self._stt_settings = settings
+        self.stt = create_recognizer(self.config, fallback=self.google_stt)
+        self.interrupt_stt = create_interrupt_recognizer(
+            self.config, _INTERRUPT_WORDS, fallback=self.google_stt
+        )
+
+    def _configure_tts(self):
+        self._voice_rate = self.config.get('voice_rate', 180)
+        self._voice_volume = self.config.get('voice_volume', 1.0)
+
+        cache_mb = self.config.get('tts_cache_mb', 0)
+        if cache_mb != self._tts_cache_mb:
+            self._tts_cache_mb = cache_mb
+            self._tts_cache = None
+            if cache_mb:
+                try:
+                    self._tts_cache = TTSCache(max_bytes=cache_mb * 1024 * 1024)
+                except OSError as e:
+                    print(f"TTS cache unavailable: {e}")
+
+        # With more than one worker, sentences are rendered to audio files in
+        # parallel while earlier ones play. Cached phrases are files too, so
+        # the cache also needs this path. Windows keeps direct playback
+        # since its engines speak one utterance at a time.
+        concurrency = self.config.get('tts_concurrency', 1)
+        render = (
+            (concurrency > 1 or self._tts_cache is not None)
+            and platform.system() in _AUDIO_PLAYERS
+        )
+        settings = (concurrency, render)
+        if settings == self._tts_settings:
+            return
+        self._tts_settings = settings
+        if self._tts_renderer is not None:
+            self._tts_renderer.shutdown(wait=False)
+            self._tts_renderer = None
+
+        if render:
+            self._tts_renderer = ThreadPoolExecutor(
+                max_workers=max(1, concurrency),
+                thread_name_prefix="tts-render"
+            )
+
+    def _configure_response_cache(self):
+        size = self.config.get('response_cache_size', 64)
+        if not size:
+            self._response_cache = None
+            return
+
+        embed = None
+        if self.config.get('semantic_cache', False):
+            embed = self._embed_text
+        self._response_cache = ResponseCache(max_entries=size, embed=embed)
+
+    def _embed_text(self, text):
+        import google.generativeai as genai
+
+        result = genai.embed_content(model="models/text-embedding-004", content=text)
+        return result["embedding"]
+
     def _configure_mqtt(self):
+        topics = self.config.get('mqtt_topic', 'emo/bridge')
+        self._mqtt_topics = [topics] if isinstance(topics, str) else list(topics)
+
         try:
+            import paho.mqtt.client as mqtt
+
             self.mqtt_client = mqtt.Client()
+            # Room for bursts of replies without paho dropping or blocking
+            self.mqtt_client.max_inflight_messages_set(50)
+            self.mqtt_client.max_queued_messages_set(1000)
             self.mqtt_client.connect(
                 self.config.get('mqtt_broker', 'localhost'),
                 self.config.get('mqtt_port', 1883),
                 60
             )
             self.mqtt_client.loop_start()
+
+            # Publishing happens on a worker so the voice loop never waits on it
+            self._mqtt_queue = queue.Queue()
+            threading.Thread(
+                target=self._mqtt_worker,
+                args=(self.mqtt_client, self._mqtt_queue),
+                daemon=True
+            ).start()
             print("MQTT connected successfully")
         except Exception as e:
             print(f"MQTT Error: {e}")
             print("MQTT connection failed - continuing without MQTT support")
             self.mqtt_client = None
 
+    def _mqtt_worker(self, client, mqtt_queue):
+        """
+        Publish queued (topic, payload) messages until a None sentinel arrives.
+
+        After the first message, anything else queued within a short window
+        is collected and published in the same pass so bursts leave together.
+        """
+        while True:
+            batch = [mqtt_queue.get()]
+            deadline = time.monotonic() + _MQTT_BATCH_WINDOW
+            while batch[-1] is not None and len(batch) < _MQTT_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(mqtt_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            for message in batch:
+                if message is None:
+                    return
+                topic, payload = message
+                try:
+                    # Fire and forget: QoS 0 never waits on a broker ack
+                    client.publish(topic, payload, qos=0, retain=False)
+                except Exception as e:
+                    print(f"MQTT publish Error: {e}")
+
     def update_config(self, config):
         self.config = config
         # Language is now hardcoded to Portuguese - no longer using config language setting
-        self._configure_gemini()
+        # Only rebuild the Gemini client when the key changes so its channel stays warm
+        with self._lock:
+            if config.get('gemini_api_key', '') != self._api_key:
+                self._configure_gemini()
+            elif self._api_key and config.get('max_output_tokens', 120) != self._max_output_tokens:
+                self._reset_models()
+        self._configure_stt()
+        self._configure_tts()
+        self._configure_response_cache()
 
-        if self.mqtt_client:
-            self.mqtt_client.loop_stop()
-            self.mqtt_client = None
+        with self._lock:
+            if self.mqtt_client:
+                self._mqtt_queue.put(None)
+                self._mqtt_queue = None
+                self.mqtt_client.loop_stop()
+                self.mqtt_client = None
 
-        if config.get('enable_mqtt', False):
-            self._configure_mqtt()
+            if config.get('enable_mqtt', False):
+                self._configure_mqtt()
 
-    def set_persona(self, persona):
-        self.persona = persona
+    def _get_model(self, persona):
+        """
+        Return the Gemini model for a persona.
 
-    def get_persona_instruction(self):
-        if self.persona == "EMO":
-            return (
-                "Speak in a playful, casual tone. "
-                "Keep replies short, friendly, sometimes with emojis or fun expressions."
-            )
-        elif self.persona == "Sophia":
-            return (
-                "Speak in a wise, formal, and calm tone. "
-                "Use full sentences, no emojis, and sound like a mentor."
+        The persona, language, emoji and quit rules never change between turns,
+        so they are sent as the model's system instruction and each request
+        only carries the user's words. Models are built once per persona.
+        """
+        model = self._models.get(persona)
+        if model is None:
+            import google.generativeai as genai
+
+            model = genai.GenerativeModel(
+                "gemini-1.5-flash",
+                system_instruction=self._build_system_instruction(persona),
+                generation_config=self._generation_config
             )
-        else:
-            return "Respond in a helpful, concise manner."
+            self._models[persona] = model
+        return model
+
+    def _build_system_instruction(self, persona):
+        instruction = self.get_persona_instruction(persona)
+
+        # Add emoji instruction for EMO persona
+        emoji_instruction = _EMOJI_INSTRUCTION if persona == "EMO" else ""
+
+        return (
+            f"You are {persona}. {instruction}\n"
+            "\n"
+            f"IMPORTANT: {_LANGUAGE_INSTRUCTION}\n"
+            f"{emoji_instruction}\n"
+            "\n"
+            f"{_QUIT_INSTRUCTION}"
+        )
+
+    def set_persona(self, persona):
+        with self._lock:
+            self.persona = persona
+            # Resolve the persona's model now rather than on every turn
+            if self._api_key:
+                self.model = self._get_model(persona)
+
+    def get_persona_instruction(self, persona=None):
+        persona = persona or self.persona
+        return _PERSONA_INSTRUCTIONS.get(persona, _DEFAULT_PERSONA_INSTRUCTION)
+
+    @property
+    def running(self):
+        return not self._stop_event.is_set()
 
     def start_chat(self):
-        if self.running:
-            return
-        self.running = True
-        self.thread = threading.Thread(target=self._voice_loop, daemon=True)
-        self.thread.start()
+        with self._lock:
+            if self.running:
+                return
+            self._stop_event = threading.Event()
+            # Each session starts a fresh conversation; replies prefetched
+            # against the last one's history don't answer anything here
+            self._histories = {}
+            self._prefetched = None
+
+            # Let the worker of a session that ended on its own (quit word,
+            # errors) exit once it has played what it still has queued
+            if self.tts_thread is not None:
+                self._tts_queue.put(None)
+
+            # Playback runs on its own worker so replies can be queued while the
+            # voice loop keeps generating and publishing
+            self._tts_queue = queue.Queue()
+            self.tts_thread = threading.Thread(
+                target=self._tts_worker,
+                args=(self._tts_queue, self._stop_event),
+                daemon=True
+            )
+            self.tts_thread.start()
+
+            self.thread = threading.Thread(
+                target=self._voice_loop,
+                args=(self._stop_event, self._tts_queue),
+                daemon=True
+            )
+            self.thread.start()
 
     def stop_chat(self):
-        self.running = False
+        with self._lock:
+            self._stop_event.set()
+            thread, self.thread = self.thread, None
+            tts_thread, self.tts_thread = self.tts_thread, None
+            tts_queue = self._tts_queue
         self._stop_background_listener()
-        self.interrupt_event.set()
+        self._interrupt_speech()
 
-        if self.thread:
-            self.thread.join(timeout=1.0)
-            self.thread = None
+        # Join outside the lock, the voice loop may need it to finish its turn
+        if thread:
+            thread.join(timeout=1.0)
 
-        if self.tts_thread and self.tts_thread.is_alive():
-            self.tts_thread.join(timeout=1.0)
+        if tts_thread and tts_thread.is_alive():
+            tts_queue.put(None)
+            tts_thread.join(timeout=1.0)
 
         self.speaking = False
 
-        # Goodbye message
+        # Goodbye message, spoken in the background so the caller (the GUI
+        # thread) isn't blocked for the length of the utterance
+        self._pool.submit(self._say_goodbye)
+
+    def _say_goodbye(self):
         try:
             print("Starting TTS playback for goodbye...")
-            speak("Goodbye!", self.config.get('voice_rate', 180), self.config.get('voice_volume', 1.0))
+            speak("Goodbye!", self._voice_rate, self._voice_volume)
             print("Finished TTS playback for goodbye.")
         except Exception as e:
             print(f"Goodbye TTS Error: {e}")
 
-    def _speak(self, text):
+    def _begin_speech(self):
         """
-        Speak text asynchronously with interruption support.
+        Prepare for a new reply: reset interruption and start listening for
+        interrupt commands while it plays
         """
+        if self.speaking:
+            return
+        if self.status_callback:
+            self.status_callback("Speaking")
         self.interrupt_event.clear()
         self.speaking = True
-        self.tts_thread = threading.Thread(
-            target=self._tts_thread_func,
-            args=(text,),
-            daemon=True
-        )
-        self.tts_thread.start()
         self._start_background_listener()
-        self.tts_thread.join()
+
+    def _queue_speech(self, text, stop_event, tts_queue):
+        """
+        Queue a piece of a reply for playback on the session's tts_queue
+        without waiting for it. Nothing is queued once the session is
+        stopped, so its interruption isn't undone either.
+        """
+        # A trailing emoji is split off as a fragment of its own; there is
+        # nothing in it to say
+        if stop_event.is_set() or not _strip_emojis(text).strip():
+            return
+        self._begin_speech()
+        if self._tts_renderer is not None:
+            # Start synthesizing now; the worker plays results in queue order
+            text = self._tts_renderer.submit(
+                self._render_speech, _strip_emojis(text), self._voice_for(self.persona)
+            )
+        tts_queue.put(text)
+
+    def _remember_turn(self, persona, text, reply):
+        """
+        Add an exchange to a persona's history, keeping only the most
+        recent turns
+        """
+        history = self._histories.setdefault(persona, [])
+        history.append(_user_turn(text))
+        history.append({"role": "model", "parts": [reply]})
+        del history[:-2 * _MAX_HISTORY_TURNS]
+
+    def _stream_reply(self, persona, model, text, stop_event, tts_queue):
+        """
+        Generate a reply with streaming, queuing each sentence for playback
+        as soon as it is complete so speech starts before generation ends.
+        Generation is abandoned once stop_event is set.
+
+        The persona's recent history is sent along so the model can follow
+        the conversation. Returns the full reply text. A bare QUIT reply is
+        never spoken since it has no sentence boundary to be split at.
+
+        Raises _ReplyBlocked when Gemini withheld the reply, and ValueError
+        when the stream ended without any text.
+        """
+        contents = self._histories.get(persona, []) + [_user_turn(text)]
+        parts = []
+        buffer = ""
+        queued = False
+        chunk = None
+        for chunk in model.generate_content(contents, stream=True):
+            chunk_text = _chunk_text(chunk)
+            parts.append(chunk_text)
+            buffer += chunk_text
+            sentences, buffer = _split_sentences(buffer)
+            if not sentences and not queued:
+                sentences, buffer = _split_first_clause(buffer)
+            for sentence in sentences:
+                self._queue_speech(sentence, stop_event, tts_queue)
+                queued = True
+
+            # Stop generating once the user has interrupted the reply or
+            # stopped the session
+            if stop_event.is_set() or (self.speaking and self.interrupt_event.is_set()):
+                break
+
+        reply = "".join(parts).strip()
+        if stop_event.is_set():
+            return reply
+        if not reply:
+            reason = _block_reason(chunk) if chunk is not None else None
+            if reason is not None:
+                raise _ReplyBlocked(reason)
+            raise ValueError("Gemini returned an empty reply")
+        if reply != "QUIT" and buffer.strip():
+            self._queue_speech(buffer.strip(), stop_event, tts_queue)
+        return reply
+
+    def _prefetch_followups(self, persona, model):
+        """
+        Speculatively generate replies to likely follow-ups while the current
+        reply is being spoken. Requests carry the same history a real turn
+        would, so results are only valid for the next turn: "sim" means
+        nothing without the reply it answers.
+        """
+        history = list(self._histories.get(persona, []))
+        futures = {}
+        for followup in _PREFETCH_FOLLOWUPS:
+            contents = history + [_user_turn(followup)]
+            futures[normalize(followup)] = self._pool.submit(
+                lambda contents=contents: model.generate_content(contents).text.strip()
+            )
+        self._prefetched = (persona, futures)
+
+    def _take_prefetched(self, persona, text):
+        """
+        Return the speculative reply for text if it was prefetched for this
+        persona during the previous turn, waiting for it if it is still
+        being generated
+        """
+        prefetched, self._prefetched = self._prefetched, None
+        if prefetched is None:
+            return None
+
+        prefetched_persona, futures = prefetched
+        future = futures.get(normalize(text))
+        if prefetched_persona != persona or future is None:
+            return None
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"Prefetched reply failed: {e}")
+            return None
+
+    def _finish_speech(self, stop_event, tts_queue):
+        """
+        Block until everything queued on tts_queue has been spoken or
+        interrupted, the session is stopped, or its playback worker has exited
+        """
+        worker = self.tts_thread
+        with tts_queue.all_tasks_done:
+            while tts_queue.unfinished_tasks:
+                # Nothing will ever mark the rest done
+                if stop_event.is_set() or worker is None or not worker.is_alive():
+                    break
+                tts_queue.all_tasks_done.wait(0.1)
         self._stop_background_listener()
         self.speaking = False
-        
+
+    def _interrupt_speech(self):
+        """
+        Stop the reply being spoken right away and drop anything still queued
+        """
+        self.interrupt_event.set()
+        if self._mac_synthesizer:
+            self._mac_synthesizer.stop()
+        stop_all()
+
+        with self._tts_lock:
+            process = self._tts_process
+        if process is None or process.poll() is not None:
+            return
+
+        process.terminate()
+        try:
+            process.wait(timeout=1.0)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+    def _get_mac_synthesizer(self):
+        """
+        Return the native macOS synthesizer, or None when pyobjc's
+        AVFoundation bindings aren't installed
+        """
+        if self._mac_synthesizer is None:
+            try:
+                self._mac_synthesizer = MacSpeechSynthesizer()
+            except Exception as e:
+                print(f"Native macOS speech unavailable, using 'say': {e}")
+                self._mac_synthesizer = False
+        return self._mac_synthesizer or None
+
+    def _tts_worker(self, tts_queue, stop_event):
+        """
+        Play queued speech in order until a None sentinel arrives, dropping
+        it once stop_event, the session's stop event, is set
+        """
+        while True:
+            text = tts_queue.get()
+            try:
+                if text is None:
+                    return
+                # Drop whatever is left of an interrupted reply or session
+                if not self.interrupt_event.is_set() and not stop_event.is_set():
+                    self._play_speech(text)
+                elif isinstance(text, Future):
+                    text.add_done_callback(self._discard_rendered_speech)
+            finally:
+                tts_queue.task_done()
+
     def _start_background_listener(self):
         """
         Start a background listener for interruptions while speaking
@@ -214,77 +838,133 @@ class EMOBridgeBackend:
         """
         Background function to listen for interruptions while speaking
         """
+        source = self._mic_source
+        if source is None:
+            return
+
+        while self.speaking and self.background_listener is not None:
+            try:
+                with self._mic_lock:
+                    audio = self.recognizer.listen(source, timeout=0.5, phrase_time_limit=1.0)
+
+                # Only spend a recognition on clips that contain speech
+                if not self._vad.has_speech(audio):
+                    continue
+                text = self.interrupt_stt.recognize(audio).lower().strip()
+                
+                # Check for interrupt commands
+                if normalize(text) in _INTERRUPT_WORDS:
+                    print("Speech interrupted by user command")
+                    self._interrupt_speech()
+                    break
+            except sr.WaitTimeoutError:
+                # Timeout is expected, just continue
+                pass
+            except Exception as e:
+                # Ignore other errors in background listener
+                pass
+
+    def _voice_for(self, persona):
+        return _MAC_VOICES.get(persona, _DEFAULT_MAC_VOICE)
+
+    def _render_speech(self, text, voice):
+        """
+        Synthesize text into an audio file and return its path. The file is
+        temporary unless it went into the TTS cache.
+        """
+        tts_cache = self._tts_cache
+        if tts_cache is not None:
+            key = cache_key(text, voice)
+            path = tts_cache.get(key)
+            if path is not None:
+                return str(path)
+
+        system = platform.system()
+        suffix = ".aiff" if system == "Darwin" else ".wav"
+        fd, path = tempfile.mkstemp(prefix="emo-tts-", suffix=suffix)
+        os.close(fd)
         try:
-            with sr.Microphone() as source:
-                while self.speaking and self.background_listener is not None:
-                    try:
-                        audio = self.recognizer.listen(source, timeout=0.5, phrase_time_limit=1.0)
-                        text = self.recognizer.recognize_google(audio).lower().strip()
-                        
-                        # Check for interrupt commands
-                        if text in ["stop", "quiet", "shut up", "be quiet", "enough"]:
-                            print("Speech interrupted by user command")
-                            self.interrupt_event.set()
-                            break
-                    except sr.WaitTimeoutError:
-                        # Timeout is expected, just continue
-                        pass
-                    except Exception as e:
-                        # Ignore other errors in background listener
-                        pass
-        except Exception as e:
-            print(f"Error in background listener: {e}")
+            if system == "Darwin":
+                subprocess.run(["say", "-v", voice, "-o", path, text], check=True)
+            else:
+                subprocess.run(["espeak", "-w", path, text], check=True)
+        except Exception:
+            os.remove(path)
+            raise
+
+        if tts_cache is not None:
+            try:
+                return str(tts_cache.put(key, path))
+            except OSError as e:
+                print(f"TTS cache Error: {e}")
+        return path
+
+    def _release_rendered_speech(self, path):
+        """
+        Delete a rendered audio file once played, keeping cached ones
+        """
+        if self._tts_cache is not None and path in self._tts_cache:
+            return
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _discard_rendered_speech(self, future):
+        """
+        Release the audio file of a rendered sentence that will never be played
+        """
+        try:
+            self._release_rendered_speech(future.result())
+        except Exception:
             pass
 
-    def _tts_thread_func(self, text):
+    def _run_interruptible(self, command):
+        """
+        Run a playback command to completion. The process is registered so
+        _interrupt_speech() can terminate it, which also ends the wait.
+        """
+        with self._tts_lock:
+            if self.interrupt_event.is_set():
+                return
+            process = subprocess.Popen(command)
+            self._tts_process = process
+        try:
+            process.wait()
+        finally:
+            with self._tts_lock:
+                self._tts_process = None
+
+    def _play_speech(self, text):
+        """
+        Play one queued item: text to speak directly, or a Future for a file
+        being rendered by the TTS pool
+        """
         try:
             print("Starting TTS playback...")
-            
-            # Select voice based on persona
-            system = platform.system()
-            if system == "Darwin":  # macOS
+
+            if isinstance(text, Future):
+                path = text.result()
+                try:
+                    self._run_interruptible(_AUDIO_PLAYERS[platform.system()] + [path])
+                finally:
+                    self._release_rendered_speech(path)
+            elif platform.system() == "Darwin":  # macOS
                 # Use specific voices for each persona
-                if self.persona == "EMO":
-                    voice = "Catarina"
-                elif self.persona == "Sophia":
-                    voice = "Joana"
-                else:
-                    voice = "Catarina"  # Default to Catarina
-                
-                # Strip emojis from text using regex
-                import re
-                emoji_pattern = re.compile(
-                    "["
-                    "\U0001F600-\U0001F64F"  # emoticons
-                    "\U0001F300-\U0001F5FF"  # symbols & pictographs
-                    "\U0001F680-\U0001F6FF"  # transport & map symbols
-                    "\U0001F700-\U0001F77F"  # alchemical symbols
-                    "\U0001F780-\U0001F7FF"  # Geometric Shapes
-                    "\U0001F800-\U0001F8FF"  # Supplemental Arrows-C
-                    "\U0001F900-\U0001F9FF"  # Supplemental Symbols and Pictographs
-                    "\U0001FA00-\U0001FA6F"  # Chess Symbols
-                    "\U0001FA70-\U0001FAFF"  # Symbols and Pictographs Extended-A
-                    "\U00002702-\U000027B0"  # Dingbats
-                    "\U000024C2-\U0001F251" 
-                    "]", flags=re.UNICODE)
+                voice = self._voice_for(self.persona)
                 
                 # Remove emojis from text
-                clean_text = emoji_pattern.sub(r'', text)
+                clean_text = _strip_emojis(text)
                 
-                # Use subprocess with voice selection
-                # Start the process but don't wait for it to complete
-                process = subprocess.Popen(["say", "-v", voice, clean_text])
-                
-                # Wait for the process to complete or for an interrupt
-                while process.poll() is None:
-                    if self.interrupt_event.is_set():
-                        # Kill the process if interrupted
-                        process.terminate()
-                        break
-                    time.sleep(0.1)
+                synthesizer = self._get_mac_synthesizer()
+                if synthesizer is not None:
+                    if not self.interrupt_event.is_set():
+                        synthesizer.speak(clean_text, voice, self.interrupt_event)
+                else:
+                    self._run_interruptible(["say", "-v", voice, clean_text])
             else:  # Windows or Linux
                 # Fall back to the existing speak function for non-macOS platforms
-                speak(text, self.config.get('voice_rate', 180), self.config.get('voice_volume', 1.0))
+                speak(text, self._voice_rate, self._voice_volume)
                 
             if not self.interrupt_event.is_set():
                 print("Finished TTS playback.")
@@ -293,118 +973,247 @@ class EMOBridgeBackend:
         except Exception as e:
             print(f"TTS Error: {e}")
 
-    def _voice_loop(self):
+    def _voice_loop(self, stop_event, tts_queue):
+        """
+        Open the microphone for the whole session and run the conversation
+        until stop_event, the session's own stop event, is set. tts_queue's
+        worker is told to exit when the session ends, however it ends.
+        """
+        source = None
+        try:
+            with sr.Microphone() as source:
+                with self._mic_lock:
+                    self._mic_source = source
+                    # Calibrate once per session instead of on every turn
+                    self.recognizer.adjust_for_ambient_noise(source, duration=0.3)
+                self._conversation_loop(source, stop_event, tts_queue)
+        except Exception as e:
+            print(f"Microphone Error: {e}")
+            stop_event.set()
+            if self.status_callback:
+                self.status_callback("Error")
+        finally:
+            # A session ending late must not take the next one's microphone
+            # away from the interrupt listener
+            with self._mic_lock:
+                if self._mic_source is source:
+                    self._mic_source = None
+            tts_queue.put(None)
+
+    def _conversation_loop(self, source, stop_event, tts_queue):
         """
         Main voice processing loop
         """
         # Track consecutive network errors for backoff strategy
-        network_error_count = 0
-        
-        while self.running:
-            try:
-                if self.status_callback:
-                    self.status_callback("Listening")
+        self._network_error_count = 0
+        self._session_status = "Idle"
 
-                with sr.Microphone() as source:
-                    print("Listening...")
-                    audio = self.recognizer.listen(source)
-                
-                # Use the language mode from config
-                language_mode = self.config.get('language_mode', 'en-US')
-                text = self.recognizer.recognize_google(audio, language=language_mode).lower().strip()
-                print(f"User said: {text}")
-
-                # Handle quit commands
-                if text in ["quit", "exit", "stop", "end"]:
-                    self.running = False
-                    if self.status_callback:
-                        self.status_callback("Idle")
+        # Consecutive failed turns outside the Gemini call (speech service,
+        # audio), backed off the same way
+        error_streak = 0
+
+        while not stop_event.is_set():
+            try:
+                text = self._listen_for_text(source, stop_event)
+                # Stopped while listening: the utterance isn't for this session
+                if text is None or stop_event.is_set():
                     break
+                if not self._handle_user_text(text, stop_event, tts_queue):
+                    break
+                error_streak = 0
+                continue
+            except sr.UnknownValueError:
+                print("Could not understand audio")
+                continue
+            except _FATAL_ERRORS as e:
+                # A bug, not a glitch: retrying would only repeat it
+                print(f"Error in voice loop: {e!r}")
+                self._session_status = "Error"
+                break
+            except sr.RequestError as e:
+                print(f"Could not request results; {e}")
+            except Exception as e:
+                print(f"Error in voice loop: {e}")
 
-                # Persona switching - detect keywords anywhere in text (case insensitive)
-                old_persona = self.persona
-                
-                # Check for 'emo' or 'imo' keyword (typo-tolerant)
-                if "emo" in text.lower() or "imo" in text.lower():
-                    self.persona = "EMO"
-                    print("Persona switched to EMO")
-                
-                # Check for 'sophia' or 'sofia' keyword
-                elif "sophia" in text.lower() or "sofia" in text.lower():
-                    self.persona = "Sophia"
-                    print("Persona switched to Sophia")
-                
-                # Notify frontend of persona change if it changed
-                if old_persona != self.persona and self.status_callback:
-                    # Use a special format that the GUI can detect
-                    self.status_callback(f"PERSONA_CHANGE:{self.persona}")
+            if self.status_callback:
+                self.status_callback("Error")
+            error_streak += 1
+            delay = _backoff_delay(error_streak, base=0.25)
+            print(f"Retrying in {delay:.1f}s")
+            if stop_event.wait(delay):
+                break
 
-                if not text or not self.model:
-                    continue
+        if self.status_callback:
+            self.status_callback(self._session_status)
 
-                instruction = self.get_persona_instruction()
-                language_mode = "pt-PT"  # Hardcoded to Portuguese
-                
-                # Add emoji instruction for EMO persona
-                emoji_instruction = "Include emojis in your responses." if self.persona == "EMO" else ""
-                
-                # Hardcoded to Portuguese - no language selection
-                language_instruction = "Always reply in Portuguese (Portugal), natural conversational style. Ignore the language the user speaks in and ALWAYS respond in Portuguese (Portugal)."
-                
-                prompt = f""" 
-                You are {self.persona}. {instruction} 
-                
-                IMPORTANT: {language_instruction}
-                {emoji_instruction}
-                
-                If the user asks to quit/exit/end/stop (in any language), reply ONLY with the word QUIT. 
-                
-                User said: "{text}" 
-                """
+    def _listen_for_text(self, source, stop_event):
+        """
+        Capture the user's next utterance and return it transcribed, or
+        None once stop_event is set
+        """
+        if self.status_callback:
+            self.status_callback("Listening")
 
-                try:
-                    response = self.model.generate_content(prompt)
-                    reply = response.text.strip()
-                    print(f"{self.persona}: {reply}")
-                    self.connection_error = False
-                    network_error_count = 0
-                except Exception as e:
-                    print(f"Network error when calling Gemini API: {e}")
-                    self.connection_error = True
-                    network_error_count += 1
-                    if self.status_callback:
-                        self.status_callback("Error: Network Connection lost")
-                    continue
+        stt = self.stt
+        print("Listening...")
+        # Wait for speech a slice at a time, releasing the microphone in
+        # between, so a stopped session neither keeps it from the next one
+        # nor answers what is said to the next one
+        while True:
+            text = None
+            try:
+                with self._mic_lock:
+                    if hasattr(stt, 'recognize_stream'):
+                        # Local streaming recognizers decode while the user talks
+                        text = stt.recognize_stream(
+                            self.recognizer.listen(source, timeout=_LISTEN_TIMEOUT, stream=True),
+                            language=self._language_mode
+                        )
+                    else:
+                        audio = self.recognizer.listen(source, timeout=_LISTEN_TIMEOUT)
+                break
+            except sr.WaitTimeoutError:
+                if stop_event.is_set():
+                    return None
 
-                if reply == "QUIT":
-                    self.running = False
-                    if self.status_callback:
-                        self.status_callback("Idle")
-                    break
+        if stop_event.is_set():
+            return None
+        if text is None:
+            text = stt.recognize(audio, language=self._language_mode)
+        return text.lower().strip()
 
-                if self.status_callback:
-                    self.status_callback("Speaking")
+    def _handle_user_text(self, text, stop_event, tts_queue):
+        """
+        Act on one utterance: quit and persona commands, then answer it,
+        speaking and publishing the reply.
 
-                self._speak(reply)
+        Returns False when the conversation should end, after setting
+        stop_event.
+        """
+        print(f"User said: {text}")
 
-                if self.mqtt_client:
-                    topic = self.config.get('mqtt_topic', 'emo/bridge')
-                    self.mqtt_client.publish(topic, reply)
+        # Handle quit commands, ignoring punctuation some recognizers add ("Stop.")
+        if normalize(text) in _QUIT_WORDS:
+            stop_event.set()
+            if self.status_callback:
+                self.status_callback("Idle")
+            return False
 
-                time.sleep(0.5)
+        # Persona switching - detect persona names anywhere in text. The
+        # persona and its model are read together so a switch from the GUI
+        # can't land halfway through the turn.
+        with self._lock:
+            old_persona = self.persona
+            match = _PERSONA_RE.search(text)
+            if match:
+                self.set_persona(_PERSONA_ALIASES[match.group(1)])
+            persona, model = self.persona, self.model
 
-            except sr.UnknownValueError:
-                print("Could not understand audio")
-                continue
-            except sr.RequestError as e:
-                print(f"Could not request results; {e}")
-                if self.status_callback:
-                    self.status_callback("Error")
-            except Exception as e:
-                print(f"Error in voice loop: {e}")
-                if self.status_callback:
-                    self.status_callback("Error")
-                time.sleep(1)
+        if persona != old_persona:
+            print(f"Persona switched to {persona}")
+            # Notify frontend using a special format that the GUI can detect
+            if self.status_callback:
+                self.status_callback(f"PERSONA_CHANGE:{persona}")
+
+        if not text or not model:
+            return True
+
+        # A reply depends on the conversation so far, while the cache is
+        # keyed on the utterance alone: only use it to open a conversation
+        response_cache = self._response_cache
+        if self._histories.get(persona):
+            response_cache = None
+
+        # Answer follow-ups prefetched during the last reply and
+        # repeated utterances from the cache without calling Gemini
+        reply = self._take_prefetched(persona, text)
+        if reply is None and response_cache is not None:
+            reply = response_cache.get(persona, text)
+
+        try:
+            if reply is None:
+                reply = self._stream_reply(persona, model, text, stop_event, tts_queue)
+                # Don't remember replies cut short by an interruption or Stop
+                interrupted = self.interrupt_event.is_set() or stop_event.is_set()
+                if response_cache is not None and not interrupted:
+                    response_cache.put(persona, text, reply)
+                print(f"{persona}: {reply}")
+            else:
+                print(f"{persona} (cached): {reply}")
+                if reply != "QUIT":
+                    self._queue_speech(reply, stop_event, tts_queue)
+            self.connection_error = False
+            self._network_error_count = 0
+        except _ReplyBlocked as e:
+            # Nothing to say and nothing to retry; wait for the next utterance
+            print(f"Gemini blocked the reply: {e}")
+            if self.status_callback:
+                self.status_callback("Error: Reply blocked")
+            return True
+        except Exception as e:
+            return self._on_gemini_error(e, stop_event, tts_queue)
+
+        # Stopped during the turn: the session is over, so the reply is
+        # neither remembered, published nor followed up
+        if stop_event.is_set():
+            return False
+
+        if reply == "QUIT":
+            stop_event.set()
+            if self.status_callback:
+                self.status_callback("Idle")
+            return False
+
+        self._remember_turn(persona, text, reply)
+
+        # Publish while the reply is being spoken. Read the queue once:
+        # update_config() may swap it out from the GUI thread meanwhile.
+        mqtt_queue = self._mqtt_queue
+        if mqtt_queue is not None:
+            # Encode once; the same bytes go to every configured topic
+            payload = reply.encode("utf-8")
+            for topic in self._mqtt_topics:
+                mqtt_queue.put_nowait((topic, payload))
+
+        # Use the playback time to get ahead on the next turn
+        if self.config.get('prefetch_followups', False):
+            self._prefetch_followups(persona, model)
+
+        # Half-duplex: the microphone would pick up our own voice, so
+        # only listen again once playback is done
+        self._finish_speech(stop_event, tts_queue)
+        return True
+
+    def _on_gemini_error(self, error, stop_event, tts_queue):
+        """
+        Back off after a failed Gemini call.
+
+        Returns False when the session should end, either because it gave up
+        after repeated failures or because it was stopped while waiting.
+        """
+        print(f"Network error when calling Gemini API: {error}")
+        self.connection_error = True
+        self._network_error_count += 1
+        # Let any sentences that arrived before the failure play out
+        self._finish_speech(stop_event, tts_queue)
+
+        if self._network_error_count >= _MAX_NETWORK_ERRORS:
+            print("Giving up after repeated network errors")
+            stop_event.set()
+            self._session_status = "Offline"
+            return False
 
         if self.status_callback:
-            self.status_callback("Idle")
+            self.status_callback("Error: Network Connection lost")
+
+        # Honor the server's requested delay on quota errors,
+        # otherwise back off exponentially
+        from google.api_core.exceptions import ResourceExhausted
+
+        delay = None
+        if isinstance(error, ResourceExhausted):
+            delay = _server_retry_delay(error)
+        if delay is None:
+            delay = _backoff_delay(self._network_error_count)
+        print(f"Retrying in {delay:.1f}s")
+        return not stop_event.wait(delay)
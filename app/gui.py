@@ -6,15 +6,37 @@ EMO Bridge Application - GUI Module
 Implements the graphical user interface for the EMO Bridge application.
 """
 
-import os
-import yaml
+import copy
+import threading
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import font, messagebox
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
-from pathlib import Path
 
-from app.backend import EMOBridgeBackend
+
+# Status indicator color for each status the backend reports; statuses
+# starting with "Error:" are shown as errors too
+_STATUS_STYLE = {
+    "Idle": "secondary",
+    "Listening": "success",
+    "Speaking": "info",
+    "Interrupted": "warning",
+    "Error": "danger",
+    "Offline": "danger",
+}
+
+# ttkbootstrap styles the widgets are created or recolored with, built up
+# front so neither window construction nor a status change has to
+_BOOTSTYLES = (
+    "primary.TCombobox",
+    "success.Outline.TButton",
+    "danger.Outline.TButton",
+    "primary.Outline.TButton",
+    "success.Round.Toggle",
+) + tuple(f"{color}.TLabel" for color in sorted(set(_STATUS_STYLE.values())))
+
+# Size the main window opens at
+_WINDOW_SIZE = (500, 600)
 
 
 class EMOBridgeApp:
@@ -29,12 +51,20 @@ class EMOBridgeApp:
             config (dict): Application configuration
         """
         self.config = config
+        # Settings as last loaded or saved, to skip saves that change nothing
+        self._config_on_disk = copy.deepcopy(config)
         self.backend = None
         self.root = None
         self.status_var = None
         self.persona_var = None
-        self.api_key_var = None
         self.mqtt_var = None
+        self.start_btn = None
+        self._last_style = None  # Current bootstyle of the status indicator
+        # Latest status and persona change waiting to be shown
+        self._status_lock = threading.Lock()
+        self._pending_status = None
+        self._pending_persona = None
+        self._status_flush_scheduled = False
         # Language is now hardcoded to Portuguese
         
     def run(self):
@@ -45,19 +75,25 @@ class EMOBridgeApp:
         self.root = ttk.Window(
             title="EMO Bridge",
             themename="cosmo",  # Modern, clean theme
-            size=(500, 600),
+            size=_WINDOW_SIZE,
             resizable=(True, True),
             minsize=(400, 500)
         )
         
-        # Center the window on screen
-        self.center_window()
+        # Keep the window hidden while it is built, so Tk lays it out once
+        # instead of after every widget
+        self.root.withdraw()
         
         # Create the UI components
         self.create_ui()
         
-        # Initialize the backend
-        self.initialize_backend()
+        # Center the window on screen; placing it runs the single layout pass
+        self.center_window()
+        self.root.deiconify()
+        
+        # Initialize the backend once the window has been laid out and
+        # mapped; importing it pulls in the speech and network stacks
+        self.root.after_idle(self.initialize_backend)
         
         # Start the main event loop
         self.root.mainloop()
@@ -66,24 +102,70 @@ class EMOBridgeApp:
         """
         Center the window on the screen
         """
-        self.root.update_idletasks()
-        width = self.root.winfo_width()
-        height = self.root.winfo_height()
-        x = (self.root.winfo_screenwidth() // 2) - (width // 2)
-        y = (self.root.winfo_screenheight() // 2) - (height // 2)
+        # Work from the size the window is given rather than measuring it:
+        # a withdrawn window has no size yet, and its content asks for less
+        width, height = _WINDOW_SIZE
+        x = (self.root.winfo_screenwidth() - width) // 2
+        y = (self.root.winfo_screenheight() - height) // 2
         self.root.geometry(f"{width}x{height}+{x}+{y}")
     
+    def create_styles(self):
+        """
+        Define the fonts and label styles used across the window once,
+        instead of having each label synthesize its own from font and
+        bootstyle options
+        """
+        # Named Tk fonts, created once and referred to by name afterwards.
+        # Kept on self: Tk deletes a named font when its Font object goes.
+        self._f_logo = font.Font(family="Helvetica", size=42, weight="bold")
+        self._f_title = font.Font(family="Helvetica", size=24)
+        self._f_indicator = font.Font(family="Helvetica", size=16)
+        self._f_status = font.Font(family="Helvetica", size=11)
+        self._f_tagline = font.Font(family="Helvetica", size=10)
+        self._f_small = font.Font(family="Helvetica", size=9)
+        self._f_foot = font.Font(family="Helvetica", size=8)
+        
+        style = self.root.style
+        colors = style.colors
+        # Configuring a bootstyle that doesn't exist yet makes ttkbootstrap
+        # build it for the current theme
+        for name in _BOOTSTYLES:
+            style.configure(name)
+        
+        style.configure("Logo.TLabel", font=self._f_logo, foreground=colors.primary)
+        style.configure("Title.TLabel", font=self._f_title, foreground=colors.secondary)
+        style.configure("Tagline.TLabel", font=self._f_tagline, foreground=colors.secondary)
+        style.configure("Description.TLabel", font=self._f_small, foreground=colors.secondary)
+        style.configure("Status.TLabel", font=self._f_status, foreground=colors.secondary)
+        style.configure("Footer.TLabel", font=self._f_foot, foreground=colors.secondary)
+    
     def create_ui(self):
         """
         Create the user interface components
         """
+        self.create_styles()
+        
         # Create main frame with padding
         main_frame = ttk.Frame(self.root, padding=20)
-        main_frame.pack(fill=tk.BOTH, expand=True)
         
-        # Enhanced App title and logo
-        title_frame = ttk.Frame(main_frame)
-        title_frame.pack(fill=tk.X, pady=(0, 20))
+        # Build each section first, then place the sections in one sweep
+        layout = [
+            (self._build_title(main_frame), dict(fill=tk.X, pady=(0, 20))),
+            (self._build_persona(main_frame), dict(fill=tk.X, pady=10)),
+            (self._build_controls(main_frame), dict(fill=tk.X, pady=15)),
+            (self._build_status(main_frame), dict(fill=tk.X, pady=10)),
+            (self._build_settings(main_frame), dict(fill=tk.BOTH, expand=True, pady=10)),
+            (self._build_footer(main_frame), dict(fill=tk.X, pady=(20, 0))),
+        ]
+        for frame, options in layout:
+            frame.pack(**options)
+        main_frame.pack(fill=tk.BOTH, expand=True)
+    
+    def _build_title(self, parent):
+        """
+        App title, logo and tagline
+        """
+        title_frame = ttk.Frame(parent)
         
         # Logo with gradient effect
         logo_frame = ttk.Frame(title_frame)
@@ -92,8 +174,7 @@ class EMOBridgeApp:
         logo_label = ttk.Label(
             logo_frame, 
             text="EMO", 
-            font=("Helvetica", 42, "bold"),
-            bootstyle="primary"
+            style="Logo.TLabel"
         )
         logo_label.pack(side=tk.LEFT)
         
@@ -101,8 +182,7 @@ class EMOBridgeApp:
         app_title = ttk.Label(
             logo_frame, 
             text="Bridge", 
-            font=("Helvetica", 24),
-            bootstyle="secondary"
+            style="Title.TLabel"
         )
         app_title.pack(side=tk.LEFT, padx=(5, 0), pady=(15, 0))
         
@@ -110,16 +190,17 @@ class EMOBridgeApp:
         tagline = ttk.Label(
             title_frame,
             text="Voice Assistant Integration Platform",
-            font=("Helvetica", 10),
-            bootstyle="secondary"
+            style="Tagline.TLabel"
         )
         tagline.pack()
+        return title_frame
+    
+    def _build_persona(self, parent):
+        """
+        Persona selector with a description of each persona
+        """
+        control_frame = ttk.Frame(parent)
         
-        # Control frame
-        control_frame = ttk.Frame(main_frame)
-        control_frame.pack(fill=tk.X, pady=10)
-        
-        # Persona selector
         persona_frame = ttk.LabelFrame(control_frame, text="Persona", padding=10)
         persona_frame.pack(fill=tk.X, pady=10)
         
@@ -138,35 +219,37 @@ class EMOBridgeApp:
         emo_desc = ttk.Label(
             persona_frame, 
             text="EMO: Playful, casual tone with emojis",
-            font=("Helvetica", 9),
-            bootstyle="secondary"
+            style="Description.TLabel"
         )
         emo_desc.pack(anchor=tk.W, pady=(5, 0))
         
         emusinio_desc = ttk.Label(
             persona_frame, 
             text="Sofia: Wise, mentor-like formal tone",
-            font=("Helvetica", 9),
-            bootstyle="secondary"
+            style="Description.TLabel"
         )
         emusinio_desc.pack(anchor=tk.W)
-        
-        # Enhanced Button frame with card-like appearance
-        button_card = ttk.LabelFrame(main_frame, text="Voice Controls", padding=15)
-        button_card.pack(fill=tk.X, pady=15)
+        return control_frame
+    
+    def _build_controls(self, parent):
+        """
+        Start and Stop buttons
+        """
+        button_card = ttk.LabelFrame(parent, text="Voice Controls", padding=15)
         
         button_frame = ttk.Frame(button_card)
         button_frame.pack(fill=tk.X)
         
-        # Start button with enhanced styling
-        start_btn = ttk.Button(
+        # Start button with enhanced styling; enabled once the backend is up
+        self.start_btn = ttk.Button(
             button_frame, 
             text="Start Listening", 
             command=self.start_chat,
             bootstyle="success-outline",
-            width=15
+            width=15,
+            state=tk.DISABLED
         )
-        start_btn.pack(side=tk.LEFT, padx=(0, 5), fill=tk.X, expand=True)
+        self.start_btn.pack(side=tk.LEFT, padx=(0, 5), fill=tk.X, expand=True)
         
         # Stop button with enhanced styling
         stop_btn = ttk.Button(
@@ -177,11 +260,14 @@ class EMOBridgeApp:
             width=15
         )
         stop_btn.pack(side=tk.LEFT, padx=(5, 0), fill=tk.X, expand=True)
-        
-        # Enhanced Status display
+        return button_card
+    
+    def _build_status(self, parent):
+        """
+        Status indicator and text
+        """
         self.status_var = tk.StringVar(value="Idle")
-        status_card = ttk.LabelFrame(main_frame, text="Assistant Status", padding=10)
-        status_card.pack(fill=tk.X, pady=10)
+        status_card = ttk.LabelFrame(parent, text="Assistant Status", padding=10)
         
         status_frame = ttk.Frame(status_card)
         status_frame.pack(fill=tk.X)
@@ -190,26 +276,29 @@ class EMOBridgeApp:
         self.status_indicator = ttk.Label(
             status_frame,
             text="●",
-            font=("Helvetica", 16),
+            font=self._f_indicator,
             bootstyle="secondary"
         )
         self.status_indicator.pack(side=tk.LEFT, padx=(0, 5))
+        self._last_style = "secondary"
         
         # Status text
         status_value = ttk.Label(
             status_frame, 
             textvariable=self.status_var,
-            font=("Helvetica", 11),
-            bootstyle="secondary"
+            style="Status.TLabel"
         )
         status_value.pack(side=tk.LEFT)
+        return status_card
+    
+    def _build_settings(self, parent):
+        """
+        Settings panel
+        """
+        settings_frame = ttk.LabelFrame(parent, text="Settings", padding=10)
         
-        # Settings panel
-        settings_frame = ttk.LabelFrame(main_frame, text="Settings", padding=10)
-        settings_frame.pack(fill=tk.BOTH, expand=True, pady=10)
-        
-        # API Key is now loaded from config.yaml only
-        self.api_key_var = tk.StringVar(value=self.config.get('gemini_api_key', ''))
+        # API Key is now loaded from config.yaml only; the backend reads it
+        # from the config directly
         
         # Language information block removed
         
@@ -229,8 +318,7 @@ class EMOBridgeApp:
         mqtt_info = ttk.Label(
             mqtt_frame,
             text="Connect EMO to your smart home devices via MQTT",
-            font=("Helvetica", 9),
-            bootstyle="secondary"
+            style="Description.TLabel"
         )
         mqtt_info.pack(anchor=tk.W, pady=(0, 5))
         
@@ -242,17 +330,19 @@ class EMOBridgeApp:
             bootstyle="primary-outline"
         )
         save_btn.pack(pady=10)
-        
-        # Enhanced Footer with version info and credits
-        footer_frame = ttk.Frame(main_frame)
-        footer_frame.pack(fill=tk.X, pady=(20, 0))
+        return settings_frame
+    
+    def _build_footer(self, parent):
+        """
+        Footer with version info and credits
+        """
+        footer_frame = ttk.Frame(parent)
         
         # Credits
         credits_label = ttk.Label(
             footer_frame, 
             text="By Codeveil Studio",
-            font=("Helvetica", 8),
-            bootstyle="secondary"
+            style="Footer.TLabel"
         )
         credits_label.pack(side=tk.LEFT)
         
@@ -260,16 +350,22 @@ class EMOBridgeApp:
         version_label = ttk.Label(
             footer_frame, 
             text="EMO Bridge v1.0",
-            font=("Helvetica", 8),
-            bootstyle="secondary"
+            style="Footer.TLabel"
         )
         version_label.pack(side=tk.RIGHT)
+        return footer_frame
     
     def initialize_backend(self):
         """
-        Initialize the backend with the current configuration
+        Initialize the backend with the current configuration.
+
+        Runs once at startup; the backend is then reused for every session.
+        If it can't be created, listening stays unavailable.
         """
         try:
+            # Inside the try: a missing dependency surfaces in the dialog
+            from app.backend import EMOBridgeBackend
+
             self.backend = EMOBridgeBackend(
                 config=self.config,
                 status_callback=self.update_status,
@@ -278,17 +374,13 @@ class EMOBridgeApp:
         except Exception as e:
             messagebox.showerror("Backend Error", f"Failed to initialize backend: {str(e)}")
             self.update_status("Error")
+            return
+        self.start_btn.configure(state=tk.NORMAL)
     
     def start_chat(self):
         """
         Start the chat session
         """
-        if not self.backend:
-            self.initialize_backend()
-            
-        if not self.backend:
-            return
-            
         try:
             self.backend.start_chat()
             self.update_status("Listening")
@@ -317,53 +409,74 @@ class EMOBridgeApp:
     
     def update_status(self, status):
         """
-        Update the status display
+        Update the status display.
+
+        Called from backend threads as well. Only the latest status is kept
+        and shown on the next idle pass of the Tk loop, so a burst of
+        updates (Listening, Speaking, Listening) costs a single redraw.
         
         Args:
             status (str): New status text
         """
-        # Check if this is a persona change notification
-        if status.startswith("PERSONA_CHANGE:"):
-            # Extract the persona name
-            new_persona = status.split(":")[1]
+        with self._status_lock:
+            # Check if this is a persona change notification
+            if status.startswith("PERSONA_CHANGE:"):
+                # Extract the persona name
+                self._pending_persona = status.split(":")[1]
+            else:
+                self._pending_status = status
+            if self._status_flush_scheduled:
+                return
+            self._status_flush_scheduled = True
+        self.root.after_idle(self._flush_status)
+
+    def _flush_status(self):
+        """
+        Show the pending status and persona change
+        """
+        with self._status_lock:
+            status, self._pending_status = self._pending_status, None
+            persona, self._pending_persona = self._pending_persona, None
+            self._status_flush_scheduled = False
+
+        if persona is not None:
             # Update the persona dropdown
-            self.persona_var.set(new_persona)
-            # Don't update the status text for persona changes
+            self.persona_var.set(persona)
+        if status is None:
             return
-            
+
         self.status_var.set(status)
         
         # Update status indicator color based on status
-        if status == "Idle":
-            self.status_indicator.configure(bootstyle="secondary")
-        elif status == "Listening":
-            self.status_indicator.configure(bootstyle="success")
-        elif status == "Speaking":
-            self.status_indicator.configure(bootstyle="info")
-        elif status == "Interrupted":
-            self.status_indicator.configure(bootstyle="warning")
-        elif status == "Error" or status.startswith("Error:"):
-            self.status_indicator.configure(bootstyle="danger")
+        style = _STATUS_STYLE.get(status)
+        if style is None and status.startswith("Error:"):
+            style = "danger"
+        # Restyling is a Tk round-trip, skip it when the color stays the same
+        if style is not None and style != self._last_style:
+            self.status_indicator.configure(bootstyle=style)
+            self._last_style = style
     
     def save_settings(self):
         """
         Save the current settings to the config file
         """
+        from app.settings import CONFIG_PATH, save_yaml
+
         # Update config with current values
-        self.config['enable_mqtt'] = self.mqtt_var.get()
         # Language is now hardcoded to Portuguese
-        self.config['language'] = 'pt'
+        config = dict(self.config, enable_mqtt=self.mqtt_var.get(), language='pt')
         
         # Save to file
-        config_path = Path(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) / 'config' / 'config.yaml'
-        
         try:
-            with open(config_path, 'w') as f:
-                yaml.dump(self.config, f, default_flow_style=False)
-            
-            # Update backend with new settings
-            if self.backend:
-                self.backend.update_config(self.config)
+            # Only rewrite the file and reconfigure the backend on a change
+            if config != self._config_on_disk:
+                save_yaml(CONFIG_PATH, config)
+                self.config = config
+                self._config_on_disk = copy.deepcopy(config)
+                
+                # Update backend with new settings
+                if self.backend:
+                    self.backend.update_config(config)
                 
             messagebox.showinfo("Settings Saved", "Settings have been saved successfully.")
         except Exception as e:
@@ -8,21 +8,17 @@ Main entry point for the EMO Bridge desktop application.
 
 import os
 import sys
-import yaml
-from pathlib import Path
 
 # Add the parent directory to sys.path to allow importing from sibling packages
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.gui import EMOBridgeApp
+from app.settings import CONFIG_PATH, load_yaml, save_yaml
 
 
 def load_config():
     """
     Load configuration from config.yaml or create default if not exists
     """
-    config_path = Path(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) / 'config' / 'config.yaml'
-    
     # Default configuration
     default_config = {
         'gemini_api_key': '',
@@ -30,35 +26,40 @@ def load_config():
         'enable_mqtt': False,
         'mqtt_broker': 'localhost',
         'mqtt_port': 1883,
-        'mqtt_topic': 'emo/bridge',
+        'mqtt_topic': 'emo/bridge',  # Topic, or list of topics, replies are published to
         'voice_rate': 180,  # Default speech rate
-        'voice_volume': 1.0  # Default volume (0.0 to 1.0)
+        'voice_volume': 1.0,  # Default volume (0.0 to 1.0)
+        'max_output_tokens': 120,  # Upper bound on reply length
+        'tts_concurrency': 1,  # Sentences synthesized ahead in parallel (1 = speak directly)
+        'tts_cache_mb': 0,  # Disk cache for spoken phrases in ~/.cache/emo-bridge/tts (0 = off)
+        'stt_engine': 'google',  # Speech recognition: 'google', or offline 'vosk' / 'whisper'
+        'vosk_model_path': 'model',  # Vosk model directory (stt_engine: vosk)
+        'whisper_model': 'small',  # faster-whisper model size (stt_engine: whisper)
+        'interrupt_vosk_model_path': '',  # English Vosk model to spot "stop" offline while speaking
+        'response_cache_size': 64,  # Replies remembered for repeated phrases (0 disables)
+        'semantic_cache': False,  # Also match near-duplicate phrases via Gemini embeddings
+        'prefetch_followups': False  # Pre-generate replies to "sim"/"não" while speaking (extra API calls)
     }
     
-    # Create config directory if it doesn't exist
-    config_path.parent.mkdir(exist_ok=True)
-    
-    # If config file doesn't exist, create it with default values
-    if not config_path.exists():
-        with open(config_path, 'w') as f:
-            yaml.dump(default_config, f, default_flow_style=False)
-        return default_config
-    
     # Load existing config
     try:
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
-        
-        # Update with any missing default keys
-        for key, value in default_config.items():
-            if key not in config:
-                config[key] = value
-        
-        return config
+        config = load_yaml(CONFIG_PATH)
+    except FileNotFoundError:
+        # First run: create the config directory and file with default values
+        CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
+        save_yaml(CONFIG_PATH, default_config)
+        return default_config
     except Exception as e:
         print(f"Error loading config: {e}")
         return default_config
 
+    # An empty file parses to None
+    if not isinstance(config, dict):
+        config = {}
+    
+    # Fill in any missing default keys
+    return {**default_config, **config}
+
 
 def main():
     """
@@ -68,6 +69,8 @@ def main():
     config = load_config()
     
     # Start the GUI application
+    from app.gui import EMOBridgeApp
+
     app = EMOBridgeApp(config)
     app.run()
 
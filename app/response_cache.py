@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+EMO Bridge Application - Response Cache Module
+Caches Gemini replies so repeated small talk ("olá", "como estás") can be
+answered without another round-trip to the API.
+"""
+
+import math
+import re
+import threading
+from collections import OrderedDict
+
+
+# Punctuation is dropped when normalizing so "Olá!" and "olá" share an entry
+_PUNCTUATION_RE = re.compile(r"[^\w\s]+", flags=re.UNICODE)
+
+
+def normalize(text):
+    """
+    Normalize user text into a cache key: lowercase, no punctuation and
+    single spaces between words
+    """
+    return " ".join(_PUNCTUATION_RE.sub(" ", text.lower()).split())
+
+
+class ResponseCache:
+    """
+    LRU cache of replies keyed by persona and normalized user text.
+
+    When an embedding function is given, a miss on the exact key falls back
+    to a cosine-similarity search over the cached utterances of the same
+    persona, so near-duplicates ("olá emo", "olá, emo!") also hit.
+    """
+    def __init__(self, max_entries=64, embed=None, threshold=0.90):
+        """
+        Args:
+            max_entries (int): Maximum number of cached replies
+            embed (callable): Optional function mapping text to a vector
+            threshold (float): Minimum cosine similarity for a semantic hit
+        """
+        self.max_entries = max_entries
+        self.embed = embed
+        self.threshold = threshold
+        self._entries = OrderedDict()  # (persona, key) -> (vector, reply)
+        self._last_vector = (None, None)  # key, vector from last get()
+        self._lock = threading.Lock()
+
+    def get(self, persona, text):
+        """
+        Return the cached reply for text, or None on a miss
+        """
+        key = (persona, normalize(text))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        vector = self._embed(text)
+        if vector is None:
+            return None
+
+        with self._lock:
+            # Remember the vector so put() does not embed the same text again
+            self._last_vector = (key, vector)
+
+            best_key, best_score = None, self.threshold
+            for cached_key, (cached_vector, _) in self._entries.items():
+                if cached_key[0] != persona or cached_vector is None:
+                    continue
+                score = sum(a * b for a, b in zip(vector, cached_vector))
+                if score >= best_score:
+                    best_key, best_score = cached_key, score
+
+            if best_key is None:
+                return None
+            self._entries.move_to_end(best_key)
+            return self._entries[best_key][1]
+
+    def put(self, persona, text, reply):
+        """
+        Store the reply given for text; empty replies aren't worth a hit
+        """
+        if not reply:
+            return
+        key = (persona, normalize(text))
+        with self._lock:
+            last_key, vector = self._last_vector
+        if last_key != key:
+            vector = self._embed(text)
+
+        with self._lock:
+            self._entries[key] = (vector, reply)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._last_vector = (None, None)
+
+    def _embed(self, text):
+        """
+        Embed text as a unit vector, or return None when embeddings are
+        disabled or the embedding call fails
+        """
+        if self.embed is None:
+            return None
+        try:
+            vector = self.embed(text)
+        except Exception as e:
+            print(f"Embedding Error: {e}")
+            return None
+
+        norm = math.sqrt(sum(x * x for x in vector))
+        if not norm:
+            return None
+        return [x / norm for x in vector]
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+EMO Bridge Application - Settings Module
+Reads and writes the YAML configuration file for the entry point and the GUI.
+"""
+
+import copy
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+import yaml
+
+# libyaml's C parser and emitter when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _Loader, CSafeDumper as _Dumper
+except ImportError:
+    from yaml import SafeLoader as _Loader, SafeDumper as _Dumper
+
+
+# config/config.yaml next to the app package
+CONFIG_PATH = Path(__file__).resolve().parent.parent / 'config' / 'config.yaml'
+
+
+# Parsed files by path, with the (mtime, size) they were parsed at
+_YAML_CACHE_SIZE = 100
+_yaml_cache = OrderedDict()
+
+
+def _file_signature(path):
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _remember(path, signature, data):
+    key = str(path)
+    _yaml_cache[key] = (signature, data)
+    _yaml_cache.move_to_end(key)
+    while len(_yaml_cache) > _YAML_CACHE_SIZE:
+        _yaml_cache.popitem(last=False)
+
+
+def load_yaml(path):
+    """
+    Parse a YAML file, reusing the previous result while the file's
+    modification time and size are unchanged.
+
+    Returns a deep copy, so callers are free to modify it.
+    """
+    signature = _file_signature(path)
+    cached = _yaml_cache.get(str(path))
+    if cached is not None and cached[0] == signature:
+        _yaml_cache.move_to_end(str(path))
+        return copy.deepcopy(cached[1])
+
+    # One read, and the parser decodes the bytes itself
+    data = yaml.load(path.read_bytes(), Loader=_Loader)
+    _remember(path, signature, data)
+    return copy.deepcopy(data)
+
+
+def save_yaml(path, data):
+    """
+    Write data to a YAML file and remember it, so loading the file again
+    doesn't parse what was just written
+    """
+    # Write a sibling file and rename it over the original, so a crash
+    # mid-write can't leave a truncated config behind
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    tmp_path.write_bytes(
+        yaml.dump(data, Dumper=_Dumper, default_flow_style=False, encoding='utf-8')
+    )
+    os.replace(tmp_path, path)
+    _remember(path, _file_signature(path), copy.deepcopy(data))
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+EMO Bridge Application - Speech Output Module
+In-process text-to-speech engines used by the backend. Each engine is
+loaded once and shared, and can be cut off mid-utterance for barge-in.
+"""
+
+import ctypes
+import ctypes.util
+import math
+import sys
+import threading
+import time
+
+
+# Shared pyttsx3 engine - initializing it loads the platform voices, so it is
+# created once and reused for every utterance. pyttsx3 is not reentrant.
+_pyttsx_engine = None
+_pyttsx_props = {}
+_pyttsx_lock = threading.Lock()
+
+
+def pyttsx_say(text, rate, volume):
+    """
+    Speak text with the shared pyttsx3 engine, creating it on first use
+    """
+    global _pyttsx_engine
+    with _pyttsx_lock:
+        if _pyttsx_engine is None:
+            # Only needed as a fallback, and importing it enumerates voices
+            import pyttsx3
+
+            _pyttsx_engine = pyttsx3.init()
+            _pyttsx_props.clear()
+
+        # Only push properties to the driver when they actually changed
+        for name, value in (("rate", rate), ("volume", volume)):
+            if _pyttsx_props.get(name) != value:
+                _pyttsx_engine.setProperty(name, value)
+                _pyttsx_props[name] = value
+
+        _pyttsx_engine.say(text)
+        _pyttsx_engine.runAndWait()
+
+
+def pyttsx_stop():
+    """
+    Cut off the utterance in progress; skips the lock the speaking thread
+    holds, since stop() is how runAndWait() is made to return early
+    """
+    if _pyttsx_engine is not None:
+        _pyttsx_engine.stop()
+
+
+# Shared SAPI voice on Windows, False once it failed to load. Talking to
+# SpVoice directly avoids pyttsx3's driver loop polling for callbacks.
+_sapi_voice = None
+_sapi_props = {}
+_sapi_lock = threading.Lock()
+_sapi_stop = threading.Event()
+_sapi_threads = threading.local()
+
+# SpeechVoiceSpeakFlags
+_SVSF_ASYNC = 1
+_SVSF_PURGE_BEFORE_SPEAK = 2
+
+# HRESULT for a thread whose COM apartment was already set up differently
+_RPC_E_CHANGED_MODE = -2147417850  # 0x80010106
+
+
+def _sapi_init_thread():
+    """
+    Join the multithreaded COM apartment, so the shared voice can be used
+    from whichever worker thread is speaking
+    """
+    import pythoncom
+
+    if not getattr(_sapi_threads, "initialized", False):
+        try:
+            pythoncom.CoInitializeEx(pythoncom.COINIT_MULTITHREADED)
+        except pythoncom.com_error as e:
+            # Something else on this thread got to COM first; use the
+            # apartment it picked
+            if e.args[0] != _RPC_E_CHANGED_MODE:
+                raise
+        _sapi_threads.initialized = True
+
+
+def sapi_say(text, rate, volume):
+    """
+    Speak text through the SAPI SpVoice COM object. Returns False when
+    pywin32 or SAPI is unavailable so the caller can fall back to pyttsx3.
+    """
+    global _sapi_voice
+    with _sapi_lock:
+        if _sapi_voice is None:
+            try:
+                # Importing pythoncom initializes COM on the importing thread
+                # with sys.coinit_flags, apartment-threaded unless told
+                # otherwise; ask for the multithreaded apartment up front
+                if "pythoncom" not in sys.modules:
+                    sys.coinit_flags = 0  # COINIT_MULTITHREADED
+                import win32com.client
+
+                _sapi_init_thread()
+                _sapi_voice = win32com.client.Dispatch("SAPI.SpVoice")
+                _sapi_props.clear()
+            except Exception as e:
+                print(f"SAPI unavailable, using pyttsx3: {e}")
+                _sapi_voice = False
+        if not _sapi_voice:
+            return False
+        _sapi_init_thread()
+
+        # SAPI rates run from -10 to 10, each step about 10% faster, with 0
+        # close to 180 words per minute
+        sapi_rate = max(-10, min(10, round(math.log(rate / 180, 1.1))))
+        for name, value in (("Rate", sapi_rate), ("Volume", int(volume * 100))):
+            if _sapi_props.get(name) != value:
+                setattr(_sapi_voice, name, value)
+                _sapi_props[name] = value
+
+        # Speak asynchronously and wait in short steps, so a stop request is
+        # acted on by this thread, which owns the current utterance
+        _sapi_stop.clear()
+        _sapi_voice.Speak(text, _SVSF_ASYNC | _SVSF_PURGE_BEFORE_SPEAK)
+        while not _sapi_voice.WaitUntilDone(50):
+            if _sapi_stop.is_set():
+                _sapi_voice.Speak("", _SVSF_ASYNC | _SVSF_PURGE_BEFORE_SPEAK)
+                break
+    return True
+
+
+def sapi_stop():
+    """
+    Cut off the utterance in progress
+    """
+    _sapi_stop.set()
+
+
+# Shared espeak-ng library on Linux, False once it failed to load. Loading
+# it in-process saves a fork/exec and voice data load for every sentence.
+_espeak_lib = None
+_espeak_props = {}
+_espeak_lock = threading.Lock()
+
+# Constants from speak_lib.h
+_ESPEAK_AUDIO_OUTPUT_SYNCH_PLAYBACK = 3
+_ESPEAK_RATE = 1
+_ESPEAK_VOLUME = 2
+_ESPEAK_POS_CHARACTER = 1
+_ESPEAK_CHARS_UTF8 = 1
+
+
+def _load_espeak():
+    name = ctypes.util.find_library("espeak-ng") or ctypes.util.find_library("espeak")
+    if name is None:
+        raise OSError("libespeak-ng not found")
+
+    lib = ctypes.CDLL(name)
+    lib.espeak_Initialize.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_char_p, ctypes.c_int]
+    lib.espeak_SetParameter.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int]
+    lib.espeak_Synth.argtypes = [
+        ctypes.c_char_p, ctypes.c_size_t, ctypes.c_uint, ctypes.c_int,
+        ctypes.c_uint, ctypes.c_uint, ctypes.POINTER(ctypes.c_uint), ctypes.c_void_p
+    ]
+    # Synchronous playback: espeak_Synth returns once the audio has played
+    if lib.espeak_Initialize(_ESPEAK_AUDIO_OUTPUT_SYNCH_PLAYBACK, 0, None, 0) <= 0:
+        raise OSError("espeak_Initialize failed")
+    return lib
+
+
+def espeak_say(text, rate, volume):
+    """
+    Speak text through the espeak-ng library. Returns False when the library
+    is unavailable so the caller can fall back to the espeak command.
+    """
+    global _espeak_lib
+    with _espeak_lock:
+        if _espeak_lib is None:
+            try:
+                _espeak_lib = _load_espeak()
+            except Exception as e:
+                print(f"espeak-ng library unavailable, using 'espeak': {e}")
+                _espeak_lib = False
+        if not _espeak_lib:
+            return False
+
+        # Rate is in words per minute, volume 0-200 with 100 as normal
+        for parameter, value in ((_ESPEAK_RATE, int(rate)), (_ESPEAK_VOLUME, int(volume * 100))):
+            if _espeak_props.get(parameter) != value:
+                _espeak_lib.espeak_SetParameter(parameter, value, 0)
+                _espeak_props[parameter] = value
+
+        data = text.encode("utf-8") + b"\0"
+        _espeak_lib.espeak_Synth(
+            data, len(data), 0, _ESPEAK_POS_CHARACTER, 0, _ESPEAK_CHARS_UTF8, None, None
+        )
+    return True
+
+
+def espeak_cancel():
+    """
+    Cut off speech in progress; deliberately skips the lock the speaking
+    thread holds
+    """
+    if _espeak_lib:
+        _espeak_lib.espeak_Cancel()
+
+
+class MacSpeechSynthesizer:
+    """
+    Native macOS speech through AVSpeechSynthesizer (pyobjc).
+
+    One synthesizer lives for the whole session, so an utterance costs no
+    process spawn or voice database load the way a 'say' call does.
+    """
+    def __init__(self):
+        from AVFoundation import AVSpeechSynthesisVoice, AVSpeechSynthesizer, AVSpeechUtterance
+
+        self._synthesizer = AVSpeechSynthesizer.alloc().init()
+        self._utterance_class = AVSpeechUtterance
+        self._voices = {voice.name(): voice for voice in AVSpeechSynthesisVoice.speechVoices()}
+
+    def speak(self, text, voice_name, stop_event):
+        """
+        Speak text and return when it has finished or stop_event is set
+        """
+        utterance = self._utterance_class.speechUtteranceWithString_(text)
+        voice = self._voices.get(voice_name)
+        if voice is not None:
+            utterance.setVoice_(voice)
+        self._synthesizer.speakUtterance_(utterance)
+
+        # Speech starts asynchronously; wait (bounded) for it to begin, then
+        # for it to end. Waiting on the event wakes at once on interrupt.
+        deadline = time.monotonic() + 1.0
+        while not self._synthesizer.isSpeaking() and time.monotonic() < deadline:
+            if stop_event.wait(0.01):
+                break
+        while self._synthesizer.isSpeaking():
+            if stop_event.wait(0.05):
+                break
+
+        if stop_event.is_set():
+            self.stop()
+
+    def stop(self):
+        self._synthesizer.stopSpeakingAtBoundary_(0)  # AVSpeechBoundaryImmediate
+
+
+def stop_all():
+    """
+    Cut off whatever the shared engines are speaking
+    """
+    espeak_cancel()
+    sapi_stop()
+    pyttsx_stop()
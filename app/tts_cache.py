@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+EMO Bridge Application - Speech Cache Module
+Keeps synthesized audio on disk so stock phrases ("Olá!", "Goodbye!") are
+played straight from a file instead of being synthesized again.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+
+DEFAULT_CACHE_DIR = Path.home() / '.cache' / 'emo-bridge' / 'tts'
+
+
+def cache_key(text, voice):
+    """
+    Key for a phrase spoken with a given voice
+    """
+    return hashlib.blake2b(f"{text}|{voice}".encode("utf-8"), digest_size=16).hexdigest()
+
+
+class TTSCache:
+    """
+    LRU cache of audio files on disk, bounded by total size.
+
+    The index (key -> file name and size, least recently used first) is kept
+    as JSON next to the files so the cache survives restarts.
+    """
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=200 * 1024 * 1024):
+        """
+        Args:
+            directory (Path): Where audio files and the index are stored
+            max_bytes (int): Total size above which old files are evicted
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._index_path = self.directory / 'index.json'
+        self._lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._entries = self._load_index()
+        self._total = sum(size for _, size in self._entries.values())
+
+    def get(self, key):
+        """
+        Return the path of the cached audio for key, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            path = self.directory / entry[0]
+            if not path.exists():
+                # Removed behind our back
+                del self._entries[key]
+                self._total -= entry[1]
+                return None
+            self._entries.move_to_end(key)
+            return path
+
+    def put(self, key, source):
+        """
+        Move the audio file at source into the cache and return its new path
+        """
+        name = key + Path(source).suffix
+        path = self.directory / name
+        shutil.move(str(source), path)
+        size = path.stat().st_size
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total -= old[1]
+            self._entries[key] = (name, size)
+            self._total += size
+
+            while self._total > self.max_bytes and len(self._entries) > 1:
+                _, (evicted, evicted_size) = self._entries.popitem(last=False)
+                self._total -= evicted_size
+                try:
+                    os.remove(self.directory / evicted)
+                except OSError:
+                    pass
+            self._save_index()
+        return path
+
+    def __contains__(self, path):
+        return Path(path).parent == self.directory
+
+    def _load_index(self):
+        try:
+            with open(self._index_path, 'r', encoding='utf-8') as f:
+                return OrderedDict((key, tuple(entry)) for key, entry in json.load(f))
+        except (OSError, ValueError, TypeError):
+            return OrderedDict()
+
+    def _save_index(self):
+        # Write then rename so a crash never leaves a truncated index
+        tmp_path = self._index_path.with_suffix('.tmp')
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump([[key, list(entry)] for key, entry in self._entries.items()], f)
+            os.replace(tmp_path, self._index_path)
+        except OSError as e:
+            print(f"TTS cache index not saved: {e}")